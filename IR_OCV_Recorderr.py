@@ -5,7 +5,7 @@ A desktop application with a simple GUI for collecting battery pack and module
 test data and saving it to a structured Excel workbook with dynamic formulas.
 
 Dependencies:
-    pip install pandas openpyxl
+    pip install pandas openpyxl xlsxwriter
     (pyzbar and other barcode libs are not strictly needed as scanner
     input is treated as a keyboard wedge, but can be added for future use)
 
@@ -21,18 +21,34 @@ Usage:
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import pandas as pd
+import numpy as np
+import xlsxwriter
 import os
 from datetime import datetime
 from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.utils import get_column_letter
 
+# Shared style objects, built once rather than on every save
+_BOLD_FONT = Font(bold=True)
+_TABLE_STYLE = TableStyleInfo(name="TableStyleLight9", showFirstColumn=False, showLastColumn=False, showRowStripes=True, showColumnStripes=False)
+
+# Summary cells display formula results, so size for numbers not formula text
+_SUMMARY_COL_WIDTH = 14
+
+# Sessions with more cells than this are written in xlsxwriter's constant_memory mode
+_CONSTANT_MEMORY_CELLS = 5000
+
+# Module sheets share a fixed schema, so IR_mOhm and OCV_V always land in columns H and I
+_IR_COL = 'H'
+_OCV_COL = 'I'
+
 class IROCV_RecorderApp:
     def __init__(self, root):
         self.root = root
         self.root.title("IR & OCV Testing Recorder")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Session data model
         self.session = {
@@ -43,7 +59,11 @@ class IROCV_RecorderApp:
             "filename": "",
             "modules_completed": 0,
             "current_module_index": 1,
-            "module_data": {} # stores pandas DataFrames for each module
+            "append_mode": False, # True when the workbook was loaded and may hold unbuffered sheets
+            "workbook": None, # openpyxl workbook kept live between saves in append mode
+            "module_data": {}, # stores pandas DataFrames for each module
+            "dirty_modules": set(), # module indices changed since the last write to disk
+            "summary_stale": False # True when a save to a loaded workbook left its Summary behind the module sheets
         }
 
         # Constants for validation
@@ -121,15 +141,27 @@ class IROCV_RecorderApp:
         if filepath:
             try:
                 wb = load_workbook(filepath)
-                module_sheets = [s for s in wb.sheetnames if s.startswith("Module_")]
+                all_names = wb.sheetnames
+                module_sheets = []
                 highest_index = 0
+                # Collect module sheets and find the highest module index to continue from
+                for s in all_names:
+                    if s.startswith("Module_"):
+                        module_sheets.append(s)
+                        highest_index = max(highest_index, int(s.split('_', 1)[1]))
+
                 if module_sheets:
-                    # Find the highest module index to continue from
-                    indices = [int(s.split('_')[1]) for s in module_sheets]
-                    highest_index = max(indices)
+                    # Buffer the existing module sheets so saves never have to re-read the file
+                    sheets = pd.read_excel(filepath, sheet_name=module_sheets, keep_default_na=False)
+                    for sheet_name, module_df in sheets.items():
+                        module_code = module_df["ModuleCode"].iloc[0] if not module_df.empty else "N/A"
+                        self.session["module_data"][int(sheet_name.split('_')[1])] = {
+                            "module_code": module_code,
+                            "dataframe": module_df
+                        }
                 
                 # Check for existing summary sheet and pack details
-                if 'Summary' in wb.sheetnames:
+                if 'Summary' in all_names:
                     summary_df = pd.read_excel(filepath, sheet_name="Summary")
                     pack_name = summary_df.loc[0, "PackName"] if "PackName" in summary_df.columns else ""
                     pack_code = summary_df.loc[0, "PackCode"] if "PackCode" in summary_df.columns else ""
@@ -139,6 +171,8 @@ class IROCV_RecorderApp:
                     # Cannot determine total modules or cells per module from summary
                     
                 self.session["filename"] = filepath
+                self.session["append_mode"] = True
+                self.session["workbook"] = wb
                 self.session["current_module_index"] = highest_index + 1
                 self.show_message(f"Workbook '{os.path.basename(filepath)}' loaded. Ready to add Module {self.session['current_module_index']}.")
                 
@@ -221,11 +255,7 @@ class IROCV_RecorderApp:
         self.cell_tree.configure(yscrollcommand=vsb.set)
 
         # Populate the table
-        self.cells = []
-        for i in range(1, self.session["cells_per_module"] + 1):
-            values = [i, "", "", "", ""]
-            item_id = self.cell_tree.insert("", "end", values=values)
-            self.cells.append(item_id)
+        self.populate_empty_cells()
         
         # Add editable functionality
         self.cell_tree.bind("<Double-1>", self.on_cell_double_click)
@@ -242,6 +272,9 @@ class IROCV_RecorderApp:
         
         self.save_button = ttk.Button(button_frame, text="Save Module Data", command=self.save_module_data)
         self.save_button.pack(side="left", expand=True, fill="x", padx=5)
+
+        self.save_disk_button = ttk.Button(button_frame, text="Save to Disk", command=self.save_to_disk)
+        self.save_disk_button.pack(side="left", padx=5)
         
         self.next_button = ttk.Button(button_frame, text="Next Module", command=self.next_module)
         self.next_button.pack(side="left", padx=5)
@@ -252,6 +285,14 @@ class IROCV_RecorderApp:
         self.update_buttons()
         self.show_message(f"Ready to scan Module {self.session['current_module_index']} code.")
 
+    def populate_empty_cells(self):
+        """Inserts one blank row per cell into the table."""
+        # Every insert is a Tcl round-trip, so keep the per-row Python work minimal
+        insert = self.cell_tree.insert
+        empty = ("", "", "", "")
+        for i in range(1, self.session["cells_per_module"] + 1):
+            insert("", "end", values=(i,) + empty)
+
     def on_cell_double_click(self, event):
         """Enables in-cell editing for the Treeview."""
         item = self.cell_tree.identify_row(event.y)
@@ -338,231 +379,348 @@ class IROCV_RecorderApp:
         self.cell_tree.delete(*self.cell_tree.get_children())
         df = self.session["module_data"].get(self.session["current_module_index"], {}).get("dataframe")
         if df is not None:
-            for _, row in df.iterrows():
-                self.cell_tree.insert("", "end", values=list(row[["CellIndex", "BatteryCode", "IR_mOhm", "OCV_V", "Notes"]]))
+            sub = df[["CellIndex", "BatteryCode", "IR_mOhm", "OCV_V", "Notes"]]
+            # Show missing readings as blank cells, not "nan", so they validate as blank again
+            sub = sub.astype(object).where(sub.notna(), "")
+            insert = self.cell_tree.insert
+            for row in sub.itertuples(index=False, name=None):
+                insert("", "end", values=row)
         else:
-            for i in range(1, self.session["cells_per_module"] + 1):
-                self.cell_tree.insert("", "end", values=(i, "", "", "", ""))
+            self.populate_empty_cells()
                 
     def save_module_data(self, silent=False):
         """Validates and saves the current module's data to the session buffer."""
         module_code = self.module_code_entry.get().strip()
-        rows = []
-        is_valid = True
-        missing_codes = False
-        
-        for item in self.cell_tree.get_children():
-            vals = self.cell_tree.item(item)["values"]
-            cell_index = vals[0]
-            battery_code = vals[1]
-            ir_str, ocv_str, notes = vals[2], vals[3], vals[4]
-            
-            if not battery_code:
-                missing_codes = True
 
-            try:
-                ir = float(ir_str) if ir_str else None
-                ocv = float(ocv_str) if ocv_str else None
-                
-                if ir is not None and ir <= 0:
-                    messagebox.showerror("Validation Error", f"IR for Cell {cell_index} must be greater than 0.")
-                    is_valid = False
-                    break
-                    
-                if ocv is not None and not (self.OCV_MIN <= ocv <= self.OCV_MAX):
-                    messagebox.showerror("Validation Error", f"OCV for Cell {cell_index} is outside the valid range ({self.OCV_MIN}-{self.OCV_MAX}V).")
-                    is_valid = False
-                    break
-                    
-                rows.append([
-                    datetime.now().isoformat(),
-                    self.session['pack_name'],
-                    self.session['pack_code'],
-                    self.session['current_module_index'],
-                    module_code,
-                    cell_index,
-                    battery_code,
-                    ir,
-                    ocv,
-                    notes
-                ])
-            except ValueError:
-                messagebox.showerror("Validation Error", f"Invalid IR or OCV value for Cell {cell_index}.")
-                is_valid = False
-                break
-        
-        if not is_valid:
+        # Pull each column out of the table once, then validate whole columns at a time
+        rows = [self.cell_tree.item(item)["values"][:5] for item in self.cell_tree.get_children()]
+        # A header-only module sheet loads as an empty table, which zip can't unpack
+        cell_indices, battery_codes, ir_strs, ocv_strs, notes = zip(*rows) if rows else ((),) * 5
+        ir_raw = np.asarray(ir_strs, dtype=object)
+        ocv_raw = np.asarray(ocv_strs, dtype=object)
+        ir = pd.to_numeric(ir_raw, errors="coerce")
+        ocv = pd.to_numeric(ocv_raw, errors="coerce")
+        missing_codes = not all(battery_codes)
+
+        # Blank readings are allowed, anything else that failed to parse is not
+        invalid = (np.isnan(ir) & (ir_raw != "")) | (np.isnan(ocv) & (ocv_raw != ""))
+        if invalid.any():
+            messagebox.showerror("Validation Error", f"Invalid IR or OCV value for Cell {cell_indices[np.argmax(invalid)]}.")
+            return False
+
+        bad_ir = ir <= 0
+        if bad_ir.any():
+            messagebox.showerror("Validation Error", f"IR for Cell {cell_indices[np.argmax(bad_ir)]} must be greater than 0.")
+            return False
+
+        bad_ocv = (ocv < self.OCV_MIN) | (ocv > self.OCV_MAX)
+        if bad_ocv.any():
+            messagebox.showerror("Validation Error", f"OCV for Cell {cell_indices[np.argmax(bad_ocv)]} is outside the valid range ({self.OCV_MIN}-{self.OCV_MAX}V).")
             return False
 
         if missing_codes and not silent:
             if not messagebox.askyesno("Warning", "Some battery codes are missing. Continue saving?"):
                 return False
         
-        df = pd.DataFrame(rows, columns=[
-            "Timestamp", "PackName", "PackCode", "ModuleIndex", "ModuleCode", "CellIndex", 
-            "BatteryCode", "IR_mOhm", "OCV_V", "Notes"
-        ])
+        # One timestamp and one set of session lookups, broadcast over every row
+        now_iso = datetime.now().isoformat()
+        module_idx = self.session["current_module_index"]
+        df = pd.DataFrame({
+            "Timestamp": now_iso,
+            "PackName": self.session['pack_name'],
+            "PackCode": self.session['pack_code'],
+            "ModuleIndex": module_idx,
+            "ModuleCode": module_code,
+            "CellIndex": cell_indices,
+            "BatteryCode": battery_codes,
+            "IR_mOhm": ir,
+            "OCV_V": ocv,
+            "Notes": notes
+        })
         
-        self.session["module_data"][self.session["current_module_index"]] = {
+        self.session["module_data"][module_idx] = {
             "module_code": module_code,
             "dataframe": df
         }
+        self.session["dirty_modules"].add(module_idx)
         
         if not silent:
-            self.write_to_excel()
-            self.show_message(f"Saved Module {self.session['current_module_index']}. Proceeding to next module.")
+            # Disk writes are deferred to Save to Disk and Finish
+            self.show_message(f"Buffered Module {module_idx} ({len(self.session['dirty_modules'])} unsaved); click Save to Disk to persist.")
             return True
         else:
             return True
 
+    def save_to_disk(self):
+        """Buffers the current module and writes all pending changes to the workbook."""
+        if not self.save_module_data(silent=True):
+            return
+        if self.write_to_excel():
+            message = f"Saved {self.session['modules_completed']} module(s) to '{os.path.basename(self.session['filename'])}'."
+            if self.session["summary_stale"]:
+                message += " The Summary is rebuilt on Finish."
+            self.show_message(message)
+
     def finish_session(self):
         """Saves final data and prompts to close."""
         if not self.save_module_data(silent=True):
             return
             
-        if self.session["modules_completed"] < self.session["num_modules"]:
+        # Modules are only buffered until now, so count the buffer rather than the last write
+        if len(self.session["module_data"]) < self.session["num_modules"]:
             if not messagebox.askyesno("Confirm Finish", "Not all modules have been saved. Do you want to finish anyway?"):
                 return
         
-        self.write_to_excel()
+        if not self.write_to_excel(rebuild_summary=True):
+            return
         messagebox.showinfo("Session Complete", f"All data saved to {self.session['filename']}.")
         self.root.destroy()
 
-    def write_to_excel(self):
-        """Writes all session data to the Excel workbook, creating/updating sheets and formulas."""
-        try:
-            if os.path.exists(self.session["filename"]):
-                wb = load_workbook(self.session["filename"])
+    def on_close(self):
+        """Offers to save buffered modules, or rebuild a stale Summary, before the window is closed."""
+        pending = len(self.session["dirty_modules"])
+        if pending or self.session["summary_stale"]:
+            if pending:
+                prompt = f"{pending} buffered module(s) have not been saved to disk. Save before closing?"
             else:
-                from openpyxl.workbook import Workbook
-                wb = Workbook()
-                wb.remove(wb.active) # Remove default sheet
-            
-            # Write/update individual module sheets
-            for module_idx, data in self.session["module_data"].items():
-                sheet_name = f"Module_{module_idx:03d}"
-                df = data["dataframe"]
-                
-                if sheet_name in wb.sheetnames:
-                    ws = wb[sheet_name]
-                    # Clear existing data before rewriting
-                    for row in ws.iter_rows():
-                        for cell in row:
-                            cell.value = None
-                    # If we need to append
-                    # start_row = ws.max_row + 1
-                    # for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False)):
-                    #     for c_idx, value in enumerate(row):
-                    #         ws.cell(row=start_row + r_idx, column=c_idx + 1, value=value)
-                    
-                else:
-                    ws = wb.create_sheet(title=sheet_name)
-
-                # Write DataFrame content to the sheet
-                for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True)):
-                    ws.append(row)
-                
-                # Apply table styling and autofit
-                tab = Table(displayName=f"ModuleTable{module_idx}", ref=f"A1:{get_column_letter(ws.max_column)}{ws.max_row}")
-                style = TableStyleInfo(name="TableStyleLight9", showFirstColumn=False, showLastColumn=False, showRowStripes=True, showColumnStripes=False)
-                tab.tableStyleInfo = style
-                ws.add_table(tab)
-                
-                for col in ws.columns:
-                    max_length = 0
-                    column = col[0].column_letter # Get the column letter
-                    for cell in col:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(cell.value)
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    ws.column_dimensions[column].width = adjusted_width
-                
-                # Freeze the header row
-                ws.freeze_panes = 'A2'
+                prompt = "The Summary sheet has not been rebuilt since the last save. Rebuild it before closing?"
+            answer = messagebox.askyesnocancel("Unsaved Changes", prompt)
+            if answer is None:
+                return
+            if answer and not self.write_to_excel(rebuild_summary=True):
+                return
+        self.root.destroy()
 
-            # Rebuild the Summary sheet from scratch
-            if 'Summary' in wb.sheetnames:
-                del wb['Summary']
-            summary_ws = wb.create_sheet(title="Summary", index=0)
+    def autofit_widths(self, headers, rows):
+        """Returns a width per column, tracking each column's longest value in one pass over the rows."""
+        widths = [len(str(h)) for h in headers]
+        for row in rows:
+            for i, v in enumerate(row):
+                # Blank cells (None, or NaN for a missing reading) must not widen the column
+                if v is None or v != v:
+                    continue
+                length = len(str(v))
+                if length > widths[i]:
+                    widths[i] = length
+        return [w + 2 for w in widths]
+
+    def build_summary_rows(self):
+        """Builds the Summary headers, per-module formula rows and PACK_TOTALS row from the buffer."""
+        # Get list of all modules for formulas, straight from the session buffer
+        module_sheets = sorted(self.session["module_data"].keys())
+        
+        # Summary sheet headers
+        summary_headers = ["ModuleIndex", "ModuleCode", "CellCount", "IR_AVG", "IR_MAX", "IR_MIN", "IR_RANGE", "OCV_AVG", "OCV_MAX", "OCV_MIN", "OCV_RANGE"]
+        summary_rows = []
 
-            # Get list of all module sheets for formulas
-            module_sheets = sorted([s for s in wb.sheetnames if s.startswith("Module_")])
+        # Populate module-level summary rows and build pack-level formulas
+        all_ir_cells = []
+        all_ocv_cells = []
+        
+        for i, module_idx in enumerate(module_sheets):
+            sheet_name = f"Module_{module_idx:03d}"
+            data = self.session["module_data"][module_idx]
+            # An empty module still points at one (blank) data row rather than a reversed H2:H1 range
+            last_row = max(len(data["dataframe"]), 1) + 1
             
-            # Summary sheet headers
-            summary_headers = ["ModuleIndex", "ModuleCode", "CellCount", "IR_AVG", "IR_MAX", "IR_MIN", "IR_RANGE", "OCV_AVG", "OCV_MAX", "OCV_MIN", "OCV_RANGE"]
-            summary_ws.append(summary_headers)
-
-            # Populate module-level summary rows and build pack-level formulas
-            all_ir_cells = []
-            all_ocv_cells = []
+            ir_col_range = f"{sheet_name}!{_IR_COL}2:{_IR_COL}{last_row}"
+            ocv_col_range = f"{sheet_name}!{_OCV_COL}2:{_OCV_COL}{last_row}"
             
-            for i, sheet_name in enumerate(module_sheets):
-                ws = wb[sheet_name]
-                ir_col_letter = get_column_letter(ws.max_column - 2)
-                ocv_col_letter = get_column_letter(ws.max_column - 1)
-                
-                ir_col_range = f"{sheet_name}!{ir_col_letter}2:{ir_col_letter}{ws.max_row}"
-                ocv_col_range = f"{sheet_name}!{ocv_col_letter}2:{ocv_col_letter}{ws.max_row}"
-                
-                all_ir_cells.append(ir_col_range)
-                all_ocv_cells.append(ocv_col_range)
-                
-                # Get module code and cell count
-                module_df = pd.read_excel(self.session["filename"], sheet_name=sheet_name)
-                module_code = module_df["ModuleCode"].iloc[0] if not module_df.empty else "N/A"
-                cell_count = len(module_df)
-                
-                # Write module-level row with formulas
-                row_num = i + 2
-                summary_ws.cell(row=row_num, column=1, value=int(sheet_name.split('_')[1]))
-                summary_ws.cell(row=row_num, column=2, value=module_code)
-                summary_ws.cell(row=row_num, column=3, value=cell_count)
-                summary_ws.cell(row=row_num, column=4, value=f"=AVERAGE({ir_col_range})")
-                summary_ws.cell(row=row_num, column=5, value=f"=MAX({ir_col_range})")
-                summary_ws.cell(row=row_num, column=6, value=f"=MIN({ir_col_range})")
-                summary_ws.cell(row=row_num, column=7, value=f"=E{row_num}-F{row_num}") # IR_MAX - IR_MIN
-                summary_ws.cell(row=row_num, column=8, value=f"=AVERAGE({ocv_col_range})")
-                summary_ws.cell(row=row_num, column=9, value=f"=MAX({ocv_col_range})")
-                summary_ws.cell(row=row_num, column=10, value=f"=MIN({ocv_col_range})")
-                summary_ws.cell(row=row_num, column=11, value=f"=I{row_num}-J{row_num}") # OCV_MAX - OCV_MIN
-
-            # Add PACK_TOTALS row
-            final_row = len(module_sheets) + 2
-            summary_ws.cell(row=final_row, column=1, value="PACK_TOTALS").font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=3, value=f"=SUM(C2:C{final_row-1})").font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=4, value=f'=AVERAGE({",".join(all_ir_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=5, value=f'=MAX({",".join(all_ir_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=6, value=f'=MIN({",".join(all_ir_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=7, value=f"=E{final_row}-F{final_row}").font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=8, value=f'=AVERAGE({",".join(all_ocv_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=9, value=f'=MAX({",".join(all_ocv_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=10, value=f'=MIN({",".join(all_ocv_cells)})').font = Font(bold=True)
-            summary_ws.cell(row=final_row, column=11, value=f"=I{final_row}-J{final_row}").font = Font(bold=True)
+            all_ir_cells.append(ir_col_range)
+            all_ocv_cells.append(ocv_col_range)
             
-            # Apply formatting
-            for col in summary_ws.columns:
-                max_length = 0
-                column = col[0].column_letter # Get the column letter
-                for cell in col:
-                    try: # Necessary to avoid error on empty cells
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                summary_ws.column_dimensions[column].width = adjusted_width
-                
-            summary_ws.freeze_panes = 'A2'
+            # Get module code and cell count
+            module_code = data["module_code"]
+            cell_count = len(data["dataframe"])
             
-            # Save the workbook
-            wb.save(self.session["filename"])
-            self.session["modules_completed"] = len(module_sheets)
+            # Build module-level row with formulas
+            row_num = i + 2
+            summary_rows.append([
+                module_idx,
+                module_code,
+                cell_count,
+                f"=AVERAGE({ir_col_range})",
+                f"=MAX({ir_col_range})",
+                f"=MIN({ir_col_range})",
+                f"=E{row_num}-F{row_num}", # IR_MAX - IR_MIN
+                f"=AVERAGE({ocv_col_range})",
+                f"=MAX({ocv_col_range})",
+                f"=MIN({ocv_col_range})",
+                f"=I{row_num}-J{row_num}", # OCV_MAX - OCV_MIN
+            ])
+
+        # Build PACK_TOTALS row, joining each list of ranges once for all three aggregates
+        final_row = len(module_sheets) + 2
+        ir_joined = ",".join(all_ir_cells)
+        ocv_joined = ",".join(all_ocv_cells)
+        totals_row = [
+            "PACK_TOTALS",
+            None,
+            f"=SUM(C2:C{final_row-1})",
+            f"=AVERAGE({ir_joined})",
+            f"=MAX({ir_joined})",
+            f"=MIN({ir_joined})",
+            f"=E{final_row}-F{final_row}",
+            f"=AVERAGE({ocv_joined})",
+            f"=MAX({ocv_joined})",
+            f"=MIN({ocv_joined})",
+            f"=I{final_row}-J{final_row}",
+        ]
+        return summary_headers, summary_rows, totals_row
+
+    def write_module_sheet(self, wb, module_idx, df):
+        """Writes one module's DataFrame to its sheet in an openpyxl workbook, replacing any previous version."""
+        sheet_name = f"Module_{module_idx:03d}"
+        all_names = wb.sheetnames
+        sheet_index = None
+        if sheet_name in all_names:
+            # Drop the stale sheet rather than blanking it cell by cell
+            sheet_index = all_names.index(sheet_name)
+            del wb[sheet_name]
+        ws = wb.create_sheet(title=sheet_name, index=sheet_index)
+
+        # Write DataFrame content to the sheet
+        ws.append(df.columns.tolist())
+        for row in df.itertuples(index=False, name=None):
+            ws.append(row)
+        for cell in ws[1]:
+            cell.font = _BOLD_FONT
+
+        # Apply table styling and autofit; a table needs at least one data row
+        if len(df):
+            tab = Table(displayName=f"ModuleTable{module_idx}", ref=f"A1:{get_column_letter(len(df.columns))}{len(df) + 1}")
+            tab.tableStyleInfo = _TABLE_STYLE
+            ws.add_table(tab)
+
+        widths = self.autofit_widths(df.columns, df.itertuples(index=False, name=None))
+        for col_idx, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        # Freeze the header row
+        ws.freeze_panes = 'A2'
+
+    def write_module_worksheet(self, workbook, module_idx, df, bold_fmt, constant_memory):
+        """Writes one module's DataFrame to a new sheet in an xlsxwriter workbook.
+
+        In constant_memory mode rows are flushed as soon as a later row is written,
+        so everything here goes out strictly top to bottom.
+        """
+        ws = workbook.add_worksheet(f"Module_{module_idx:03d}")
+
+        # xlsxwriter rejects NaN, so blank readings go out as empty cells
+        values = df.astype(object).where(df.notna(), None)
+        # A table needs at least one data row, so an empty module gets a plain header too
+        use_table = not constant_memory and len(df) > 0
+        if not use_table:
+            ws.write_row(0, 0, df.columns, bold_fmt)
+        for r_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+            ws.write_row(r_idx, 0, row)
+
+        if use_table:
+            # The table writes the header row itself
+            ws.add_table(0, 0, len(df), len(df.columns) - 1, {
+                "name": f"ModuleTable{module_idx}",
+                "style": "Table Style Light 9",
+                "columns": [{"header": str(col), "header_format": bold_fmt} for col in df.columns]
+            })
+        else:
+            # Tables aren't available when streaming or empty, so fall back to a header filter
+            ws.autofilter(0, 0, len(df), len(df.columns) - 1)
+
+        widths = self.autofit_widths(df.columns, values.itertuples(index=False, name=None))
+        for col_idx, width in enumerate(widths):
+            ws.set_column(col_idx, col_idx, width)
+
+        # Freeze the header row
+        ws.freeze_panes(1, 0)
+
+    def write_summary_worksheet(self, summary_ws, bold_fmt):
+        """Writes the Summary rows into an xlsxwriter worksheet, top to bottom."""
+        # xlsxwriter writes strings starting with '=' as formulas
+        summary_headers, summary_rows, totals_row = self.build_summary_rows()
+        summary_ws.write_row(0, 0, summary_headers, bold_fmt)
+        for r_idx, row in enumerate(summary_rows, start=1):
+            summary_ws.write_row(r_idx, 0, row)
+        summary_ws.write_row(len(summary_rows) + 1, 0, totals_row, bold_fmt)
+
+        summary_ws.set_column(0, len(summary_headers) - 1, _SUMMARY_COL_WIDTH)
+        summary_ws.freeze_panes(1, 0)
+
+    def write_summary_sheet(self, wb):
+        """Rebuilds the Summary sheet of an openpyxl workbook from scratch."""
+        if 'Summary' in wb.sheetnames:
+            del wb['Summary']
+        summary_ws = wb.create_sheet(title="Summary", index=0)
+
+        summary_headers, summary_rows, totals_row = self.build_summary_rows()
+        summary_ws.append(summary_headers)
+        for row in summary_rows:
+            summary_ws.append(row)
+        summary_ws.append(totals_row)
+        for cell in summary_ws[len(summary_rows) + 2]:
+            cell.font = _BOLD_FONT
+
+        # Apply formatting
+        for col_idx in range(1, len(summary_headers) + 1):
+            summary_ws.column_dimensions[get_column_letter(col_idx)].width = _SUMMARY_COL_WIDTH
+        summary_ws.freeze_panes = 'A2'
+
+    def write_new_workbook(self):
+        """Regenerates the whole workbook, Summary included, from the session buffer using xlsxwriter."""
+        # Very large packs stream every row straight to disk to keep memory flat
+        total_cells = sum(len(data["dataframe"]) for data in self.session["module_data"].values())
+        constant_memory = total_cells > _CONSTANT_MEMORY_CELLS
+
+        with xlsxwriter.Workbook(self.session["filename"], {"constant_memory": constant_memory}) as workbook:
+            bold_fmt = workbook.add_format({"bold": True})
+
+            # Sheets keep the order they are added in, so reserve the Summary tab first
+            # and fill it last, once every module range is known
+            summary_ws = workbook.add_worksheet("Summary")
+
+            for module_idx, data in sorted(self.session["module_data"].items()):
+                self.write_module_worksheet(workbook, module_idx, data["dataframe"], bold_fmt, constant_memory)
+
+            self.write_summary_worksheet(summary_ws, bold_fmt)
+
+    def update_existing_workbook(self, rebuild_summary):
+        """Rewrites the changed module sheets, and optionally the Summary, of a loaded workbook with openpyxl."""
+        # Reuse the workbook parsed by load_workbook, which sets it along with append_mode
+        wb = self.session["workbook"]
+
+        # Only modules changed since the last save need their sheets regenerated
+        for module_idx in sorted(self.session["dirty_modules"]):
+            self.write_module_sheet(wb, module_idx, self.session["module_data"][module_idx]["dataframe"])
+
+        if rebuild_summary:
+            self.write_summary_sheet(wb)
+        
+        # Save the workbook
+        wb.save(self.session["filename"])
+
+    def write_to_excel(self, rebuild_summary=False):
+        """Writes all session data to the Excel workbook, creating/updating sheets and formulas.
+
+        A regenerated workbook always gets a fresh Summary. A loaded workbook keeps
+        its old Summary unless rebuild_summary is set, which Finish and close do,
+        and summary_stale records that it still needs rebuilding.
+        """
+        try:
+            if self.session["append_mode"]:
+                # A loaded workbook may hold sheets we never buffered, so edit it in place
+                self.update_existing_workbook(rebuild_summary)
+            else:
+                # We own this file, so regenerate it from the buffer with xlsxwriter,
+                # which streams XML straight into the zip without an in-memory cell graph
+                self.write_new_workbook()
+            self.session["modules_completed"] = len(self.session["module_data"])
+            self.session["dirty_modules"].clear()
+            self.session["summary_stale"] = self.session["append_mode"] and not rebuild_summary
+            return True
             
         except Exception as e:
             messagebox.showerror("Excel Write Error", f"An error occurred while writing to the Excel file: {e}")
+            return False
 
 if __name__ == "__main__":
     root = tk.Tk()